@@ -1,8 +1,11 @@
 # cli.py
 
 import argparse
-from .controllers.scanner import quick_summary, scan_project, delete_project
-from .controllers.generator import generate_file
+from .controllers.scanner import quick_summary, scan_project, scan_projects, delete_project
+from .controllers.generator import generate_file, generate_files
+from .controllers.search import search_analyses
+from .controllers.maintenance import vacuum_database
+from .controllers.snapshot import export_project, import_project
 
 def main():
     parser = argparse.ArgumentParser(
@@ -11,13 +14,30 @@ def main():
     )
     parser.add_argument(
         '-d', '--dir', '--directory',
-        help='Path to the directory to process'
+        nargs='+',
+        help='Path to the directory to process (several may be given with -a/--analyze)'
+    )
+    parser.add_argument(
+        '--dir-file',
+        help='File listing directories to analyze, one per line'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        help='Number of projects to analyze in parallel (default: number of CPUs)'
     )
     parser.add_argument(
         '-a', '--analyze',
         action='store_true',
         help='Analyze files using AI (requires API access)'
     )
+    parser.add_argument(
+        '--progress-json',
+        nargs='?',
+        const='-',
+        metavar='PATH',
+        help='Emit scan progress as JSON lines to PATH (default: stdout)'
+    )
     parser.add_argument(
         '-r', '--remove',
         action='store_true',
@@ -41,12 +61,91 @@ def main():
         '-t', '--template',
         help='Path to a template file'
     )
+    parser.add_argument(
+        '-p', '--pair',
+        nargs=2,
+        action='append',
+        metavar=('TEMPLATE', 'OUTPUT'),
+        help='Template and output file to generate; may be repeated to generate several files in one run'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Ignore cached results for generate and quick summary'
+    )
+    parser.add_argument(
+        '-s', '--search',
+        metavar='QUERY',
+        help='Search stored analyses locally (optionally limited to --dir)'
+    )
+    parser.add_argument(
+        '--export',
+        metavar='SNAPSHOT',
+        help='Export the scan results of --dir to a compressed snapshot file'
+    )
+    parser.add_argument(
+        '--import',
+        dest='import_path',
+        metavar='SNAPSHOT',
+        help='Import a snapshot file into the database as the project at --dir'
+    )
+    parser.add_argument(
+        '--vacuum',
+        nargs='?',
+        const=0,
+        type=int,
+        metavar='PAGES',
+        help='Compact analysis history and reclaim database space (optionally at most PAGES pages)'
+    )
     args = parser.parse_args()
+
+    directories = list(args.dir or [])
+    if args.dir_file:
+        with open(args.dir_file, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    directories.append(line)
+    if len(directories) > 1 or args.dir_file:
+        if not args.analyze:
+            parser.error("Multiple directories are only supported with '-a/--analyze'.")
+        if args.jobs is not None and args.jobs < 1:
+            parser.error("Argument '-j/--jobs' must be at least 1.")
+        failed = scan_projects(directories, args.jobs, args.progress_json)
+        if failed:
+            parser.exit(1)
+        return
+    args.dir = directories[0] if directories else None
     
-    if args.generate:
+    if args.vacuum is not None:
+        print(vacuum_database(args.vacuum))
+    elif args.export or args.import_path:
+        if not args.dir:
+            parser.error("Argument '-d/--dir' is required when using '--export' or '--import'.")
+        if args.export:
+            output = export_project(args.dir, args.export)
+        else:
+            output = import_project(args.import_path, args.dir)
+        if output:
+            print(output)
+    elif args.search:
+        output = search_analyses(args.search, args.dir)
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(output)
+        else:
+            print(output)
+    elif args.generate:
         if not args.dir:
             parser.error("Argument '-d/--dir' is required when using '-g/--generate'.")
-        output = generate_file(args.dir, args.template)
+        if args.pair:
+            if args.template or args.output:
+                parser.error("'-p/--pair' cannot be combined with '-t/--template' or '-o/--output'.")
+            failed = generate_files(args.dir, args.pair, use_cache=not args.no_cache)
+            if failed:
+                parser.exit(1)
+            return
+        output = generate_file(args.dir, args.template, use_cache=not args.no_cache)
         if args.output:
             with open(args.output, 'w') as f:
                 f.write(output)
@@ -56,14 +155,9 @@ def main():
         if args.remove:
             delete_project(args.dir)
         elif args.analyze:
-            output = scan_project(args.dir)
-            if args.output:
-                with open(args.output, 'w') as f:
-                    f.write(output)
-            else:
-                print(output)
+            scan_project(args.dir, args.progress_json)
         elif args.quick:
-            output = quick_summary(args.dir)
+            output = quick_summary(args.dir, use_cache=not args.no_cache)
             if args.output:
                 with open(args.output, 'w') as f:
                     f.write(output)
@@ -1,5 +1,7 @@
 # config.py
 
+import os
+
 EXCLUDE_DIRS = {
     'node_modules', 'bower_components', 'vendor',        # JavaScript, PHP
     'venv', '.venv', '__pycache__', 'env', '.env',       # Python
@@ -199,3 +201,42 @@ PROMPTS = {
 
     'generate': "You are a code analysis AI tool. You will be provided a JSON object called project_data containing high-level analysis of the overall code project, sub-products, and files. You will additionally be provided a document example or template. You should generate a document based on the provided document example or template filling it out using the data provided in the JSON object. Provide the filled-out template as your response."
 }
+
+# Files larger than this (in bytes) are recorded but not sent for analysis
+MAX_ANALYSIS_FILE_SIZE = 256 * 1024
+
+# Number of leading bytes sniffed to classify a file before reading it
+CLASSIFIER_SNIFF_BYTES = 8192
+
+# Minified code detection thresholds; a file must be large enough and made of
+# long lines on average, a single long line in ordinary source is not enough
+MINIFIED_MIN_SIZE = 4096
+MINIFIED_AVG_LINE_LENGTH = 300
+MINIFIED_MAX_LINE_LENGTH = 1000
+# Minified code is nearly free of whitespace (a few percent), while prose with
+# long unwrapped paragraphs is around a sixth spaces
+MINIFIED_MAX_WHITESPACE_RATIO = 0.1
+
+# Header patterns written by code generators, matched against each of the
+# first lines of a file
+GENERATED_FILE_MARKERS = [
+    r'@generated\b',
+    r'\bCode generated .* DO NOT EDIT\.',
+    r'<auto-generated',
+    r'Generated by the protocol buffer compiler\.\s+DO NOT EDIT!',
+]
+
+# Maximum OpenAI requests in flight across all parallel scan workers
+MAX_CONCURRENT_REQUESTS = 8
+
+OPENAI_MODEL = 'gpt-4o-mini'
+
+# Cached generate/quick summary responses expire after this many seconds
+RESPONSE_CACHE_TTL = 7 * 24 * 60 * 60
+
+# Least recently used responses are evicted beyond this many entries
+RESPONSE_CACHE_MAX_ENTRIES = 500
+
+# Number of analyses kept per file, including the latest; older ones are
+# compacted away during each scan
+ANALYSIS_HISTORY_KEEP = max(int(os.environ.get('CODEAINATOR_ANALYSIS_HISTORY', 3)), 1)
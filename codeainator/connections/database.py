@@ -1,21 +1,59 @@
 import sqlite3
 import os
 import threading
+from .search_index import create_search_index
+from ..config import ANALYSIS_HISTORY_KEEP
 
 DB_DIR = os.environ.get('CODEAINATOR_DB_PATH', os.path.join(os.path.expanduser('~'), '.codeainator'))
 DB_PATH = os.path.join(DB_DIR, 'codeainator.db')
 DB_LOCK = threading.Lock()
+# Seconds to wait on a lock held by another process before failing
+DB_TIMEOUT = 30
 
 def get_db_connection():
     os.makedirs(DB_DIR, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, timeout=DB_TIMEOUT)
     return conn
 
+def add_missing_columns(cursor, table, columns):
+    cursor.execute(f'PRAGMA table_info({table})')
+    existing = {row[1] for row in cursor.fetchall()}
+    added = []
+    for column, column_type in columns.items():
+        if column not in existing:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+            added.append(column)
+    return added
+
+def compact_analysis_history(cursor, project_id=None, keep=ANALYSIS_HISTORY_KEEP):
+    """Delete all but the newest `keep` analyses of each file, never the latest one."""
+    project_filter = 'WHERE f.project_id = ?' if project_id is not None else ''
+    params = (project_id, keep) if project_id is not None else (keep,)
+    cursor.execute(f'''
+        DELETE FROM file_analysis WHERE id IN (
+            SELECT id FROM (
+                SELECT fa.id, ROW_NUMBER() OVER (PARTITION BY fa.file_id ORDER BY fa.id DESC) AS position
+                FROM file_analysis fa
+                JOIN files f ON f.id = fa.file_id
+                {project_filter}
+            )
+            WHERE position > ?
+        )
+        AND id NOT IN (SELECT latest_analysis_id FROM files WHERE latest_analysis_id IS NOT NULL)
+    ''', params)
+    return cursor.rowcount
+
 def initialize_database():
     with DB_LOCK:
         conn = get_db_connection()
         cursor = conn.cursor()
 
+        # Free pages can be reclaimed incrementally; only takes effect on a new database
+        cursor.execute('PRAGMA auto_vacuum=INCREMENTAL')
+
+        # Let scan workers read while a single writer stores results
+        cursor.execute('PRAGMA journal_mode=WAL')
+
         # Create projects table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS projects (
@@ -52,6 +90,8 @@ def initialize_database():
                 type TEXT,
                 last_modified REAL,
                 file_hash TEXT,
+                skip_reason TEXT,
+                latest_analysis_id INTEGER,
                 FOREIGN KEY(project_id) REFERENCES projects(id),
                 FOREIGN KEY(product_id) REFERENCES products(id)
             )
@@ -68,5 +108,32 @@ def initialize_database():
             )
         ''')
 
+        # Create response_cache table for generate and quick summary results
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT,
+                created REAL,
+                last_used REAL
+            )
+        ''')
+
+        # Add columns introduced after a database was first created
+        added = add_missing_columns(cursor, 'files', {'skip_reason': 'TEXT', 'latest_analysis_id': 'INTEGER'})
+        if 'latest_analysis_id' in added:
+            cursor.execute('''
+                UPDATE files SET latest_analysis_id = (
+                    SELECT MAX(id) FROM file_analysis WHERE file_id = files.id
+                )
+            ''')
+
+        # Indexes for file upserts and the shared analysis cache
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_project_path ON files(project_id, relative_path)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_files_hash ON files(file_hash)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_file_analysis_file ON file_analysis(file_id)')
+
+        # Create the full-text search index over stored analyses
+        create_search_index(cursor)
+
         conn.commit()
         conn.close()
@@ -0,0 +1,53 @@
+# connections/response_cache.py
+
+import hashlib
+import time
+from .database import get_db_connection, DB_LOCK
+from ..config import RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES
+
+def make_cache_key(*parts):
+    hasher = hashlib.sha256()
+    for part in parts:
+        encoded = (part or '').encode('utf-8')
+        # Length-prefix each part so adjacent parts cannot run together
+        hasher.update(len(encoded).to_bytes(8, 'big'))
+        hasher.update(encoded)
+    return hasher.hexdigest()
+
+def get_cached_response(key):
+    now = time.time()
+    with DB_LOCK:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT response, created FROM response_cache WHERE key = ?', (key,))
+        row = cursor.fetchone()
+        response = None
+        if row:
+            if row[1] + RESPONSE_CACHE_TTL > now:
+                response = row[0]
+                cursor.execute('UPDATE response_cache SET last_used = ? WHERE key = ?', (now, key))
+            else:
+                cursor.execute('DELETE FROM response_cache WHERE key = ?', (key,))
+            conn.commit()
+        conn.close()
+    return response
+
+def store_cached_response(key, response):
+    now = time.time()
+    with DB_LOCK:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT OR REPLACE INTO response_cache (key, response, created, last_used)
+            VALUES (?, ?, ?, ?)
+        ''', (key, response, now, now))
+
+        # Evict expired entries, then the least recently used beyond the limit
+        cursor.execute('DELETE FROM response_cache WHERE created <= ?', (now - RESPONSE_CACHE_TTL,))
+        cursor.execute('''
+            DELETE FROM response_cache WHERE key IN (
+                SELECT key FROM response_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+        ''', (RESPONSE_CACHE_MAX_ENTRIES,))
+        conn.commit()
+        conn.close()
@@ -0,0 +1,105 @@
+# connections/search_index.py
+
+import json
+
+# Bumped when the layout of search_index changes; stored in PRAGMA user_version
+SEARCH_INDEX_VERSION = 2
+
+def file_rowid(file_id):
+    return file_id * 2
+
+def product_rowid(product_id):
+    return product_id * 2 + 1
+
+def create_search_index(cursor):
+    cursor.execute('PRAGMA user_version')
+    version = cursor.fetchone()[0]
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'search_index'")
+    if cursor.fetchone():
+        if version >= SEARCH_INDEX_VERSION:
+            return
+        # Older indexes were not keyed by rowid, so rebuild them
+        cursor.execute('DROP TABLE search_index')
+
+    # One row per file (its latest analysis) and one per product summary.
+    # Rows are keyed by rowid (see file_rowid and product_rowid) so updates
+    # are lookups rather than scans of the whole index.
+    cursor.execute('''
+        CREATE VIRTUAL TABLE search_index USING fts5(
+            kind UNINDEXED,
+            project_id UNINDEXED,
+            item_id UNINDEXED,
+            path,
+            purpose,
+            key_components,
+            dependencies,
+            tokenize = 'porter unicode61'
+        )
+    ''')
+    cursor.execute(f'PRAGMA user_version = {SEARCH_INDEX_VERSION}')
+    rebuild_search_index(cursor)
+
+def flatten_field(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return '\n'.join(flatten_field(item) for item in value)
+    if isinstance(value, dict):
+        return '\n'.join(flatten_field(item) for item in value.values())
+    return str(value)
+
+def index_file_analysis(cursor, project_id, file_id, relative_path, analysis_result):
+    try:
+        analysis_data = json.loads(analysis_result)
+    except (json.JSONDecodeError, TypeError):
+        analysis_data = {}
+    if not isinstance(analysis_data, dict):
+        analysis_data = {}
+
+    cursor.execute('''
+        INSERT OR REPLACE INTO search_index (rowid, kind, project_id, item_id, path, purpose, key_components, dependencies)
+        VALUES (?, 'file', ?, ?, ?, ?, ?, ?)
+    ''', (
+        file_rowid(file_id), project_id, file_id, relative_path,
+        flatten_field(analysis_data.get('purpose')),
+        flatten_field(analysis_data.get('keyComponents')),
+        flatten_field(analysis_data.get('dependencies'))
+    ))
+
+def index_product_summary(cursor, project_id, product_id, manifest_path, summary):
+    cursor.execute('''
+        INSERT OR REPLACE INTO search_index (rowid, kind, project_id, item_id, path, purpose, key_components, dependencies)
+        VALUES (?, 'product', ?, ?, ?, ?, '', '')
+    ''', (product_rowid(product_id), project_id, product_id, manifest_path, summary or ''))
+
+def remove_file_from_index(cursor, file_id):
+    cursor.execute('DELETE FROM search_index WHERE rowid = ?', (file_rowid(file_id),))
+
+def remove_product_from_index(cursor, product_id):
+    cursor.execute('DELETE FROM search_index WHERE rowid = ?', (product_rowid(product_id),))
+
+def remove_project_from_index(cursor, project_id):
+    # Must run before the project's files and products are deleted
+    cursor.execute('''
+        DELETE FROM search_index WHERE rowid IN (
+            SELECT id * 2 FROM files WHERE project_id = ?
+            UNION ALL
+            SELECT id * 2 + 1 FROM products WHERE project_id = ?
+        )
+    ''', (project_id, project_id))
+
+def rebuild_search_index(cursor):
+    cursor.execute('DELETE FROM search_index')
+
+    # Index the most recent analysis of each file
+    cursor.execute('''
+        SELECT f.project_id, f.id, f.relative_path, fa.analysis_result
+        FROM files f
+        JOIN file_analysis fa ON fa.id = f.latest_analysis_id
+    ''')
+    for project_id, file_id, relative_path, analysis_result in cursor.fetchall():
+        index_file_analysis(cursor, project_id, file_id, relative_path, analysis_result)
+
+    cursor.execute('SELECT project_id, id, manifest_path, summary FROM products WHERE summary IS NOT NULL')
+    for project_id, product_id, manifest_path, summary in cursor.fetchall():
+        index_product_summary(cursor, project_id, product_id, manifest_path, summary)
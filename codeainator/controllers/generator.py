@@ -2,14 +2,26 @@
 
 import os
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from ..connections.database import initialize_database, get_db_connection, DB_LOCK
 from ..connections.openai_client import openai_client
-from ..config import PROMPTS
+from ..connections.response_cache import make_cache_key, get_cached_response, store_cached_response
+from ..config import PROMPTS, OPENAI_MODEL
 from ..utils.ProgressAnimation import ProgressAnimation
 
 client = openai_client()
 
-def generate_file(directory, template_path=None):
+DEFAULT_TEMPLATE = "- **Primary Language(s)**: *(List the main programming languages used)*\n" \
+                   "- **Frameworks/Libraries**: *(Identify any frameworks or libraries that are used)*\n" \
+                   "- **Build Tools/Package Managers**: *(e.g., npm, yarn, pip, Maven, etc.)*\n" \
+                   "- **Project Structure**:\n" \
+                   "  - **Monorepo**: *(Yes/No)*\n" \
+                   "  - **Notable Modules/Packages**: *(List any significant modules or packages)*\n" \
+                   "- **Key Directories/Files**: *(Highlight important directories or files and their purposes)*\n" \
+                   "- **Assumptions**: *(List any reasonable assumptions based on the data)*\n\n"
+
+def load_project_data(directory):
     initialize_database()
     directory = os.path.abspath(os.path.expanduser(directory))
     
@@ -44,7 +56,7 @@ def generate_file(directory, template_path=None):
             cursor.execute('''
                 SELECT f.relative_path, fa.analysis_result
                 FROM files f
-                LEFT JOIN file_analysis fa ON f.id = fa.file_id
+                LEFT JOIN file_analysis fa ON fa.id = f.latest_analysis_id
                 WHERE f.product_id = ?
             ''', (product_id,))
             files = cursor.fetchall()
@@ -70,7 +82,7 @@ def generate_file(directory, template_path=None):
         cursor.execute('''
             SELECT f.relative_path, fa.analysis_result
             FROM files f
-            LEFT JOIN file_analysis fa ON f.id = fa.file_id
+            LEFT JOIN file_analysis fa ON fa.id = f.latest_analysis_id
             WHERE f.project_id = ? AND f.product_id IS NULL
         ''', (project_id,))
         files = cursor.fetchall()
@@ -91,26 +103,20 @@ def generate_file(directory, template_path=None):
         
         conn.close()
     
-    project_data = json.dumps(result, indent=4)
-    
-    if template_path:
-        template_path_expanded = os.path.abspath(os.path.expanduser(template_path))
-        if not os.path.isfile(template_path_expanded):
-            print(f"Template file '{template_path}' not found.")
-            return
-        with open(template_path_expanded, 'r') as f:
-            template = f.read()
-    else:
-        template = "- **Primary Language(s)**: *(List the main programming languages used)*\n" \
-                   "- **Frameworks/Libraries**: *(Identify any frameworks or libraries that are used)*\n" \
-                   "- **Build Tools/Package Managers**: *(e.g., npm, yarn, pip, Maven, etc.)*\n" \
-                   "- **Project Structure**:\n" \
-                   "  - **Monorepo**: *(Yes/No)*\n" \
-                   "  - **Notable Modules/Packages**: *(List any significant modules or packages)*\n" \
-                   "- **Key Directories/Files**: *(Highlight important directories or files and their purposes)*\n" \
-                   "- **Assumptions**: *(List any reasonable assumptions based on the data)*\n\n"
-        
-    messages = [
+    return json.dumps(result, indent=4)
+
+def read_template(template_path):
+    if not template_path:
+        return DEFAULT_TEMPLATE
+    template_path_expanded = os.path.abspath(os.path.expanduser(template_path))
+    if not os.path.isfile(template_path_expanded):
+        print(f"Template file '{template_path}' not found.")
+        return None
+    with open(template_path_expanded, 'r') as f:
+        return f.read()
+
+def build_messages(project_data, template):
+    return [
         {
             "role": "system",
             "content": PROMPTS['generate']
@@ -121,12 +127,100 @@ def generate_file(directory, template_path=None):
                        f"template: {template}"
         }
     ]
-    
+
+def generation_cache_key(project_data, template):
+    return make_cache_key('generate', project_data, template, PROMPTS['generate'], OPENAI_MODEL)
+
+def generate_file(directory, template_path=None, use_cache=True):
+    project_data = load_project_data(directory)
+    if project_data is None:
+        return
+    template = read_template(template_path)
+    if template is None:
+        return
+
+    cache_key = generation_cache_key(project_data, template)
+    if use_cache:
+        cached = get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+    messages = build_messages(project_data, template)
+
     with ProgressAnimation('Analyzing'):
         completion = client.chat.completions.create(
-            model="gpt-4o-mini",
+            model=OPENAI_MODEL,
             messages=messages
         )
     
     summary = completion.choices[0].message.content
-    return summary
\ No newline at end of file
+    store_cached_response(cache_key, summary)
+    return summary
+
+def stream_to_file(project_data, template, output_path, use_cache=True):
+    cache_key = generation_cache_key(project_data, template)
+    cached = get_cached_response(cache_key) if use_cache else None
+
+    # Write to a temporary file next to the output and only move it into
+    # place once complete, so a failed stream never looks like a success
+    temp_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'w') as f:
+            if cached is not None:
+                f.write(cached)
+            else:
+                messages = build_messages(project_data, template)
+                stream = client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=messages,
+                    stream=True
+                )
+                parts = []
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        f.write(chunk.choices[0].delta.content)
+                        parts.append(chunk.choices[0].delta.content)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    if cached is None:
+        store_cached_response(cache_key, ''.join(parts))
+
+def generate_files(directory, targets, use_cache=True):
+    """Generate several documents from one load of the project data.
+
+    targets is a list of (template_path, output_path) pairs. The completions
+    run concurrently and each one is streamed into its own output file.
+    Returns the output paths that failed.
+    """
+    project_data = load_project_data(directory)
+    if project_data is None:
+        return [output_path for _, output_path in targets]
+
+    failed = []
+    jobs = []
+    for template_path, output_path in targets:
+        template = read_template(template_path)
+        if template is None:
+            failed.append(output_path)
+        else:
+            jobs.append((template, output_path))
+
+    with ProgressAnimation('Generating'):
+        with ThreadPoolExecutor(max_workers=max(len(jobs), 1)) as executor:
+            futures = {
+                executor.submit(stream_to_file, project_data, template, output_path, use_cache): output_path
+                for template, output_path in jobs
+            }
+            for future in as_completed(futures):
+                output_path = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error generating '{output_path}': {e}")
+                    failed.append(output_path)
+
+    return failed
@@ -0,0 +1,48 @@
+# controllers/maintenance.py
+
+import os
+from ..connections.database import (
+    initialize_database, get_db_connection, compact_analysis_history, DB_LOCK, DB_PATH
+)
+
+def database_size():
+    return sum(
+        os.path.getsize(path) for path in (DB_PATH, DB_PATH + '-wal')
+        if os.path.exists(path)
+    )
+
+def vacuum_database(pages=0):
+    """Compact analysis history and reclaim free pages.
+
+    pages limits how many free pages are released in one run; 0 releases all
+    of them. A database created before incremental vacuuming was enabled is
+    converted with one full VACUUM first.
+    """
+    initialize_database()
+    size_before = database_size()
+
+    with DB_LOCK:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        removed = compact_analysis_history(cursor)
+
+        # Merge the search index segments
+        cursor.execute("INSERT INTO search_index(search_index) VALUES('optimize')")
+        conn.commit()
+
+        cursor.execute('PRAGMA auto_vacuum')
+        if cursor.fetchone()[0] != 2:
+            print("Converting database to incremental vacuum, this may take a while...")
+            cursor.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            cursor.execute('VACUUM')
+        else:
+            # incremental_vacuum frees one page per step; executescript steps it to completion
+            conn.executescript(f'PRAGMA incremental_vacuum({int(pages)});' if pages else 'PRAGMA incremental_vacuum;')
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        cursor.fetchall()
+        conn.close()
+
+    size_after = database_size()
+    return (f"Removed {removed} old analyses.\n"
+            f"Database size: {size_before / 1048576:.1f} MB -> {size_after / 1048576:.1f} MB")
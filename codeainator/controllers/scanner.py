@@ -5,15 +5,47 @@ import hashlib
 import json
 import re
 import pathspec
+import multiprocessing
+import threading
 from collections import deque
-
-from ..utils.ProgressAnimation import ProgressAnimation
-from ..connections.database import initialize_database, get_db_connection, DB_LOCK
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+
+from ..utils.ProgressTracker import ProgressTracker, QueueProgress, drain_progress_queue
+from ..utils.file_classifier import classify_file
+from ..connections.database import initialize_database, get_db_connection, compact_analysis_history, DB_LOCK
+from ..connections.response_cache import make_cache_key, get_cached_response, store_cached_response
+from ..connections.search_index import (
+    index_file_analysis, index_product_summary, remove_file_from_index, remove_product_from_index,
+    remove_project_from_index
+)
 from ..connections.openai_client import openai_client
-from ..config import EXCLUDE_DIRS, EXCLUDE_FILES, PROJECT_MANIFESTS, CODE_FILE_EXTENSIONS, PROMPTS
+from ..config import (
+    EXCLUDE_DIRS, EXCLUDE_FILES, PROJECT_MANIFESTS, CODE_FILE_EXTENSIONS, PROMPTS, MAX_CONCURRENT_REQUESTS, OPENAI_MODEL
+)
 
 client = openai_client()
 
+# Shared across scan worker processes to cap concurrent OpenAI requests
+request_semaphore = None
+
+# Carries progress updates from scan worker processes to the parent
+worker_progress_queue = None
+
+# Progress of the scan running in this process, if any
+active_progress = None
+
+def init_scan_worker(semaphore, progress_queue):
+    global request_semaphore, worker_progress_queue
+    request_semaphore = semaphore
+    worker_progress_queue = progress_queue
+
+def report(message):
+    if active_progress is not None:
+        active_progress.log(message)
+    else:
+        print(message)
+
 def get_gitignore_spec(directory):
     gitignore_path = os.path.join(directory, '.gitignore')
     if os.path.isfile(gitignore_path):
@@ -41,20 +73,24 @@ def call_openai_chat(prompt, content, retries=2):
                 {'role': 'system', 'content': prompt},
                 {'role': 'user', 'content': content}
             ]
-            completion = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=messages
-            )
+            with request_semaphore or nullcontext():
+                completion = client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=messages
+                )
+            if active_progress is not None and completion.usage:
+                active_progress.add_tokens(completion.usage.total_tokens)
             return completion.choices[0].message.content
         except Exception as e:
             if attempt < retries - 1:
-                print(f"Error during OpenAI call, retrying ({attempt + 1}/{retries}): {e}")
+                report(f"Error during OpenAI call, retrying ({attempt + 1}/{retries}): {e}")
                 continue
             else:
-                print("Max retries reached. Error during OpenAI call:", e)
+                report(f"Max retries reached. Error during OpenAI call: {e}")
                 raise
 
-def quick_summary(directory):
+def quick_summary(directory, use_cache=True):
+    initialize_database()
     directory = os.path.abspath(os.path.expanduser(directory))
     file_list = []
     spec = get_gitignore_spec(directory)
@@ -66,43 +102,148 @@ def quick_summary(directory):
             relative_path = os.path.relpath(file_path, directory)
             file_list.append(relative_path)
 
-    summary = call_openai_chat(PROMPTS['quick_summary'], f"{file_list}")
+    content = f"{file_list}"
+    cache_key = make_cache_key('quick_summary', content, PROMPTS['quick_summary'], OPENAI_MODEL)
+    if use_cache:
+        cached = get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+    summary = call_openai_chat(PROMPTS['quick_summary'], content)
+    store_cached_response(cache_key, summary)
     return summary
 
-def scan_project(directory):
+def scan_project(directory, progress_json=None):
     initialize_database()
+    progress = ProgressTracker(os.path.basename(os.path.abspath(os.path.expanduser(directory))), progress_json)
+    try:
+        scan = collect_project(directory, progress)
+        store_project(scan, progress)
+    finally:
+        progress.finish()
+
+def collect_project_in_worker(directory):
+    return collect_project(directory, QueueProgress(worker_progress_queue))
+
+def scan_projects(directories, jobs=None, progress_json=None):
+    """Scan several projects concurrently with a process pool.
+
+    Workers only read from the database; every result is written by this
+    process through store_project, so there is a single writer.
+    """
+    initialize_database()
+    directories = [os.path.abspath(os.path.expanduser(d)) for d in directories]
+    semaphore = multiprocessing.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+    failed = []
+
+    # Workers forward their per-file progress to one tracker in this process
+    progress = ProgressTracker('workspace', progress_json)
+    progress_queue = multiprocessing.Queue()
+    drain_thread = threading.Thread(target=drain_progress_queue, args=(progress_queue, progress))
+    drain_thread.start()
+
+    scanned = 0
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_scan_worker,
+                                 initargs=(semaphore, progress_queue)) as executor:
+            futures = {executor.submit(collect_project_in_worker, directory): directory for directory in directories}
+            for future in as_completed(futures):
+                directory = futures[future]
+                try:
+                    store_project(future.result(), progress)
+                    scanned += 1
+                except Exception as e:
+                    progress.log(f"Error scanning project '{directory}': {e}")
+                    failed.append(directory)
+    finally:
+        # Always stop the drain thread, or an error here would leave the process hanging
+        progress_queue.put(None)
+        drain_thread.join()
+        progress.log(f"Projects scanned: {scanned} of {len(directories)}")
+        progress.finish()
+    return failed
+
+def load_previous_scan(cursor, directory):
+    previous = {'files': {}, 'products': {}, 'summary': None}
+    cursor.execute('SELECT id, summary FROM projects WHERE path = ?', (directory,))
+    row = cursor.fetchone()
+    if row is None:
+        return previous
+    project_id, previous['summary'] = row
+
+    cursor.execute('''
+        SELECT f.relative_path, f.file_hash, f.product_id, fa.analysis_result
+        FROM files f
+        LEFT JOIN file_analysis fa ON fa.id = f.latest_analysis_id
+        WHERE f.project_id = ?
+    ''', (project_id,))
+    for relative_path, file_hash, product_id, analysis_result in cursor.fetchall():
+        previous['files'][relative_path] = (file_hash, product_id, analysis_result)
+
+    cursor.execute('SELECT id, manifest_path, summary FROM products WHERE project_id = ?', (project_id,))
+    for product_id, manifest_path, summary in cursor.fetchall():
+        previous['products'].setdefault(manifest_path, (product_id, summary))
+    return previous
+
+def find_cached_analysis(cursor, file_hash, file_type):
+    # Identical content analyzed in any project can be reused as-is
+    cursor.execute('''
+        SELECT fa.analysis_result
+        FROM files f
+        JOIN file_analysis fa ON fa.id = f.latest_analysis_id
+        WHERE f.file_hash = ? AND f.type = ?
+        ORDER BY fa.id DESC
+        LIMIT 1
+    ''', (file_hash, file_type))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def collect_project(directory, progress=None):
+    """Walk and analyze a project without writing to the database.
+
+    Previous results and the shared analysis cache are only read, so several
+    projects can be collected concurrently while store_project writes.
+    """
+    global active_progress
     directory = os.path.abspath(os.path.expanduser(directory))
     project_name = os.path.basename(directory)
-    print(f"Project '{project_name}' scan started.")
+    if progress is None:
+        progress = ProgressTracker(project_name)
+    active_progress = progress
+    try:
+        return collect_project_files(directory, project_name, progress)
+    finally:
+        active_progress = None
+
+def collect_project_files(directory, project_name, progress):
+    progress.log(f"Project '{project_name}' scan started.")
 
     spec = get_gitignore_spec(directory)
 
+    # Walk the tree up front so the total file count is known for the ETA
+    tree = []
+    for root, dirs, files in os.walk(directory):
+        filter_dirs_and_files(root, dirs, files, directory, spec)
+        tree.append((root, files))
+    progress.add_total(sum(len(files) for _, files in tree))
+
     with DB_LOCK:
         conn = get_db_connection()
         cursor = conn.cursor()
+        previous = load_previous_scan(cursor, directory)
 
-        # Insert or update the project
-        cursor.execute('''
-            INSERT OR REPLACE INTO projects (id, path, name, last_scanned)
-            VALUES (
-                (SELECT id FROM projects WHERE path = ?),
-                ?, ?, ?
-            )
-        ''', (directory, directory, project_name, time.time()))
-        conn.commit()
+        scan = {
+            'path': directory,
+            'name': project_name,
+            'last_scanned': time.time(),
+            'summary': None,
+            'products': {},
+            'files': []
+        }
 
-        # Get the project ID
-        cursor.execute('SELECT id FROM projects WHERE path = ?', (directory,))
-        project_id = cursor.fetchone()[0]
-
-        # Initialize variables
-        files_processed = set()
         product_context_stack = deque()
 
-        for root, dirs, files in os.walk(directory):
-            filter_dirs_and_files(root, dirs, files, directory, spec)
-            rel_dir = os.path.relpath(root, directory)
-
+        for root, files in tree:
             # Check for product manifests in the current directory
             matched_manifests = []
             for filename in files:
@@ -116,33 +257,27 @@ def scan_project(directory):
             # Process matched manifests
             for manifest_path, product_type in matched_manifests:
                 relative_manifest_path = os.path.relpath(manifest_path, directory)
-                product_name = os.path.basename(root)
-
-                # Insert or update the product
-                cursor.execute('''
-                    INSERT OR IGNORE INTO products (project_id, name, type, manifest_path)
-                    VALUES (?, ?, ?, ?)
-                ''', (project_id, product_name, product_type, relative_manifest_path))
-                conn.commit()
-
-                # Get the product ID
-                cursor.execute('SELECT id FROM products WHERE project_id = ? AND manifest_path = ?', (project_id, relative_manifest_path))
-                product_id = cursor.fetchone()[0]
+                scan['products'][relative_manifest_path] = {
+                    'name': os.path.basename(root),
+                    'type': product_type,
+                    'summary': None
+                }
+                product_key = relative_manifest_path
 
                 # Push the current product context onto the stack
-                product_context_stack.append((root, product_id))
+                product_context_stack.append((root, product_key))
 
             if not matched_manifests:
                 # Use the last known product context
                 while product_context_stack:
-                    context_root, context_product_id = product_context_stack[-1]
+                    context_root, context_product_key = product_context_stack[-1]
                     if root.startswith(context_root):
-                        product_id = context_product_id
+                        product_key = context_product_key
                         break
                     else:
                         product_context_stack.pop()
                 else:
-                    product_id = None  # No product context
+                    product_key = None  # No product context
 
             # Process files in the current directory
             for file in files:
@@ -152,90 +287,201 @@ def scan_project(directory):
                 extension = os.path.splitext(name)[1].lower()
                 file_type = 'code' if extension in CODE_FILE_EXTENSIONS else 'other'
 
-                print(f"Analyzing '{relative_path}'.")
+                # Classify the file before reading it so binary, oversized,
+                # minified and generated files are never sent for analysis
+                skip_reason = None
+                if file_type in ('code', 'project_manifest'):
+                    skip_reason = classify_file(file_path)
 
-                # Insert or update the file
                 last_modified = os.path.getmtime(file_path)
-                file_hash = compute_file_hash(file_path)
-
-                cursor.execute('''
-                    INSERT OR REPLACE INTO files (
-                        id, project_id, product_id, relative_path, name, extension, type, last_modified, file_hash
-                    ) VALUES (
-                        (SELECT id FROM files WHERE project_id = ? AND relative_path = ?),
-                        ?, ?, ?, ?, ?, ?, ?, ?
-                    )
-                ''', (
-                    project_id, relative_path,
-                    project_id, product_id, relative_path, name, extension, file_type, last_modified, file_hash
-                ))
-                conn.commit()
-
-                # Get the file ID
-                cursor.execute('SELECT id FROM files WHERE project_id = ? AND relative_path = ?', (project_id, relative_path))
-                file_id = cursor.fetchone()[0]
+                # Skipped files are never analyzed, so a stat fingerprint
+                # stands in for the hash and they are not read in full
+                if skip_reason:
+                    file_hash = compute_stat_fingerprint(file_path)
+                else:
+                    file_hash = compute_file_hash(file_path)
+
+                file_data = {
+                    'relative_path': relative_path,
+                    'name': name,
+                    'extension': extension,
+                    'type': file_type,
+                    'last_modified': last_modified,
+                    'file_hash': file_hash,
+                    'skip_reason': skip_reason,
+                    'product': product_key,
+                    'analysis': None,
+                    'changed': False
+                }
 
                 # Analyze code and manifest files
-                if file_type in ('code', 'project_manifest'):
-                    if file_type == 'code':
-                        prompt = PROMPTS['code_analysis']
+                error = False
+                if file_type in ('code', 'project_manifest') and not skip_reason:
+                    previous_hash, _, previous_analysis = previous['files'].get(relative_path, (None, None, None))
+                    if previous_hash == file_hash and previous_analysis:
+                        file_data['analysis'] = previous_analysis
                     else:
-                        prompt = PROMPTS['project_manifest']
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-
-                        # Analyze file content
-                        analysis_result = analyze_file_content(content, prompt)
-
-                        # Insert analysis result into database
-                        cursor.execute('''
-                            INSERT INTO file_analysis (file_id, analysis_result, analysis_timestamp)
-                            VALUES (?, ?, ?)
-                        ''', (file_id, analysis_result, time.time()))
-                        conn.commit()
-                    except Exception as e:
-                        print(f"Error analyzing file {relative_path}: {e}")
-
-                files_processed.add(relative_path)
-
-        # Generate summaries for products
-        cursor.execute('SELECT id, name FROM products WHERE project_id = ?', (project_id,))
-        product_list = cursor.fetchall()
-        for product_id, product_name in product_list:
-            # Fetch analysis results for files associated with this product
-            cursor.execute('''
-                SELECT fa.analysis_result
-                FROM file_analysis fa
-                JOIN files f ON fa.file_id = f.id
-                WHERE f.product_id = ?
-            ''', (product_id,))
-            analysis_results = cursor.fetchall()
-            if analysis_results:
-                product_summary = generate_product_summary(analysis_results)
-                cursor.execute('''
-                    UPDATE products SET summary = ?
-                    WHERE id = ?
-                ''', (product_summary, product_id))
-                conn.commit()
+                        file_data['changed'] = True
+                        cached_analysis = find_cached_analysis(cursor, file_hash, file_type)
+                        if cached_analysis:
+                            file_data['analysis'] = cached_analysis
+                        else:
+                            if file_type == 'code':
+                                prompt = PROMPTS['code_analysis']
+                            else:
+                                prompt = PROMPTS['project_manifest']
+                            try:
+                                with open(file_path, 'r', encoding='utf-8') as f:
+                                    content = f.read()
+
+                                # Analyze file content
+                                file_data['analysis'] = analyze_file_content(content, prompt)
+                            except Exception as e:
+                                progress.log(f"Error analyzing file {relative_path}: {e}")
+                                error = True
+
+                scan['files'].append(file_data)
+                progress.update(error=error, skipped=bool(skip_reason))
 
-        # Generate project summary
+        conn.close()
+
+    # Generate summaries for products, reusing the previous summary when
+    # none of the product's files changed, appeared or disappeared
+    for manifest_path, product in scan['products'].items():
+        product_files = [f for f in scan['files'] if f['product'] == manifest_path]
+        analysis_results = [f['analysis'] for f in product_files if f['analysis']]
+        if not analysis_results:
+            continue
+        previous_product_id, previous_summary = previous['products'].get(manifest_path, (None, None))
+        previous_paths = {
+            path for path, (_, product_id, analysis) in previous['files'].items()
+            if product_id == previous_product_id and analysis
+        }
+        current_paths = {f['relative_path'] for f in product_files if f['analysis']}
+        if previous_summary and previous_paths == current_paths and not any(f['changed'] for f in product_files):
+            product['summary'] = previous_summary
+        else:
+            product['summary'] = generate_product_summary(analysis_results)
+
+    # Generate project summary
+    product_summaries = [p['summary'] for p in scan['products'].values() if p['summary']]
+    if product_summaries:
+        previous_summaries = [summary for _, summary in previous['products'].values() if summary]
+        if previous['summary'] and sorted(product_summaries) == sorted(previous_summaries):
+            scan['summary'] = previous['summary']
+        else:
+            scan['summary'] = generate_project_summary(product_summaries)
+
+    return scan
+
+def store_project(scan, progress=None):
+    """Write the results of collect_project to the database in one transaction."""
+    with DB_LOCK:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        # Insert or update the project
         cursor.execute('''
-            SELECT summary FROM products
-            WHERE project_id = ?
-        ''', (project_id,))
-        product_summaries = [row[0] for row in cursor.fetchall() if row[0]]
-        if product_summaries:
-            project_summary = generate_project_summary(product_summaries)
+            INSERT OR REPLACE INTO projects (id, path, name, summary, last_scanned)
+            VALUES (
+                (SELECT id FROM projects WHERE path = ?),
+                ?, ?, ?, ?
+            )
+        ''', (scan['path'], scan['path'], scan['name'], scan['summary'], scan['last_scanned']))
+
+        # Get the project ID
+        cursor.execute('SELECT id FROM projects WHERE path = ?', (scan['path'],))
+        project_id = cursor.fetchone()[0]
+
+        # Insert or update the products
+        product_ids = {}
+        for manifest_path, product in scan['products'].items():
+            cursor.execute('SELECT id FROM products WHERE project_id = ? AND manifest_path = ?', (project_id, manifest_path))
+            row = cursor.fetchone()
+            if row:
+                product_id = row[0]
+                cursor.execute('''
+                    UPDATE products SET name = ?, type = ?, summary = COALESCE(?, summary)
+                    WHERE id = ?
+                ''', (product['name'], product['type'], product['summary'], product_id))
+            else:
+                cursor.execute('''
+                    INSERT INTO products (project_id, name, type, summary, manifest_path)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (project_id, product['name'], product['type'], product['summary'], manifest_path))
+                product_id = cursor.lastrowid
+            product_ids[manifest_path] = product_id
+            if product['summary']:
+                index_product_summary(cursor, project_id, product_id, manifest_path, product['summary'])
+
+        # Insert or update the files
+        for file_data in scan['files']:
+            relative_path = file_data['relative_path']
             cursor.execute('''
-                UPDATE projects SET summary = ?
-                WHERE id = ?
-            ''', (project_summary, project_id))
-            conn.commit()
+                INSERT OR REPLACE INTO files (
+                    id, project_id, product_id, relative_path, name, extension, type, last_modified, file_hash, skip_reason,
+                    latest_analysis_id
+                ) VALUES (
+                    (SELECT id FROM files WHERE project_id = ? AND relative_path = ?),
+                    ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                    (SELECT latest_analysis_id FROM files WHERE project_id = ? AND relative_path = ?)
+                )
+            ''', (
+                project_id, relative_path,
+                project_id, product_ids.get(file_data['product']), relative_path, file_data['name'],
+                file_data['extension'], file_data['type'], file_data['last_modified'], file_data['file_hash'],
+                file_data['skip_reason'],
+                project_id, relative_path
+            ))
+
+            # Get the file ID
+            cursor.execute('SELECT id FROM files WHERE project_id = ? AND relative_path = ?', (project_id, relative_path))
+            file_id = cursor.fetchone()[0]
+
+            # Insert new analysis results into database
+            if file_data['analysis'] and file_data['changed']:
+                cursor.execute('''
+                    INSERT INTO file_analysis (file_id, analysis_result, analysis_timestamp)
+                    VALUES (?, ?, ?)
+                ''', (file_id, file_data['analysis'], time.time()))
+                cursor.execute('UPDATE files SET latest_analysis_id = ? WHERE id = ?', (cursor.lastrowid, file_id))
+                index_file_analysis(cursor, project_id, file_id, relative_path, file_data['analysis'])
+            elif not file_data['analysis']:
+                # The analysis failed or the file is now skipped; detach any
+                # analysis of older content so it is neither reused nor shared
+                cursor.execute('UPDATE files SET latest_analysis_id = NULL WHERE id = ?', (file_id,))
+                remove_file_from_index(cursor, file_id)
+
+        # Remove files and products that are no longer in the tree
+        prune_missing_entries(cursor, project_id, scan)
+
+        # Drop analysis history beyond the retention policy
+        compact_analysis_history(cursor, project_id)
 
+        conn.commit()
         conn.close()
-    print(f"Project '{project_name}' scanned successfully.")
-    print(f"Total files processed: {len(files_processed)}")
+    message = (f"Project '{scan['name']}' scanned successfully.\n"
+               f"Total files processed: {len(scan['files'])}")
+    if progress is not None:
+        progress.log(message)
+    else:
+        print(message)
+
+def prune_missing_entries(cursor, project_id, scan):
+    live_paths = {file_data['relative_path'] for file_data in scan['files']}
+    cursor.execute('SELECT id, relative_path FROM files WHERE project_id = ?', (project_id,))
+    missing_files = [(file_id,) for file_id, relative_path in cursor.fetchall() if relative_path not in live_paths]
+    for (file_id,) in missing_files:
+        remove_file_from_index(cursor, file_id)
+    cursor.executemany('DELETE FROM file_analysis WHERE file_id = ?', missing_files)
+    cursor.executemany('DELETE FROM files WHERE id = ?', missing_files)
+
+    cursor.execute('SELECT id, manifest_path FROM products WHERE project_id = ?', (project_id,))
+    missing_products = [(product_id,) for product_id, manifest_path in cursor.fetchall()
+                        if manifest_path not in scan['products']]
+    for (product_id,) in missing_products:
+        remove_product_from_index(cursor, product_id)
+    cursor.executemany('DELETE FROM products WHERE id = ?', missing_products)
 
 def delete_project(directory):
     initialize_database()
@@ -255,6 +501,7 @@ def delete_project(directory):
         project_id = result[0]
 
         # Delete related entries
+        remove_project_from_index(cursor, project_id)
         cursor.execute('DELETE FROM file_analysis WHERE file_id IN (SELECT id FROM files WHERE project_id = ?)', (project_id,))
         cursor.execute('DELETE FROM files WHERE project_id = ?', (project_id,))
         cursor.execute('DELETE FROM products WHERE project_id = ?', (project_id,))
@@ -264,6 +511,10 @@ def delete_project(directory):
         conn.close()
     print(f"Project at '{directory}' and its related data have been deleted from the database.")
 
+def compute_stat_fingerprint(file_path):
+    stat = os.stat(file_path)
+    return f"stat:{stat.st_size}:{stat.st_mtime_ns}"
+
 def compute_file_hash(file_path):
     hasher = hashlib.sha256()
     with open(file_path, 'rb') as f:
@@ -286,17 +537,17 @@ def analyze_file_content(content, prompt, max_retries=2):
 
         except json.JSONDecodeError as e:
             if attempt < max_retries - 1:
-                print("JSON decode error, retrying analysis...")
+                report("JSON decode error, retrying analysis...")
                 continue
             else:
-                print("Max retries reached. JSON decode error:", e)
+                report(f"Max retries reached. JSON decode error: {e}")
                 raise
         except Exception as e:
-            print("Error during analysis:", e)
+            report(f"Error during analysis: {e}")
             raise
 
 def generate_product_summary(analysis_results):
-    combined_results = "\n".join([result[0] for result in analysis_results])
+    combined_results = "\n".join(analysis_results)
     summary = call_openai_chat(PROMPTS['product_summary'], combined_results)
     return summary.strip()
 
@@ -0,0 +1,54 @@
+# controllers/search.py
+
+import os
+import re
+from ..connections.database import initialize_database, get_db_connection, DB_LOCK
+
+# Column weights for bm25 ranking, in search_index column order:
+# kind, project_id, item_id, path, purpose, key_components, dependencies
+SEARCH_WEIGHTS = (0.0, 0.0, 0.0, 2.0, 4.0, 2.0, 1.0)
+
+def build_match_query(query):
+    # Quote each term so FTS5 operators in user input are matched literally
+    terms = re.findall(r'\w+', query)
+    return ' OR '.join(f'"{term}"*' for term in terms)
+
+def search_analyses(query, directory=None, limit=20):
+    initialize_database()
+    match_query = build_match_query(query)
+    if not match_query:
+        return "No search terms provided."
+
+    with DB_LOCK:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        sql = f'''
+            SELECT si.kind, p.path, si.path,
+                   snippet(search_index, 4, '', '', '...', 24)
+            FROM search_index si
+            JOIN projects p ON p.id = si.project_id
+            WHERE search_index MATCH ?
+        '''
+        params = [match_query]
+        if directory:
+            directory = os.path.abspath(os.path.expanduser(directory))
+            sql += ' AND p.path = ?'
+            params.append(directory)
+        sql += f' ORDER BY bm25(search_index, {", ".join(str(w) for w in SEARCH_WEIGHTS)}) LIMIT ?'
+        params.append(limit)
+
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        conn.close()
+
+    if not rows:
+        return f"No results found for '{query}'."
+
+    lines = []
+    for rank, (kind, project_path, path, purpose) in enumerate(rows, start=1):
+        location = os.path.join(project_path, path) if path else project_path
+        lines.append(f"{rank}. [{kind}] {location}")
+        if purpose:
+            lines.append(f"   {purpose}")
+    return "\n".join(lines)
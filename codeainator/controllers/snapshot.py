@@ -0,0 +1,216 @@
+# controllers/snapshot.py
+
+import gzip
+import json
+import os
+import time
+from ..connections.database import initialize_database, get_db_connection, DB_LOCK
+from ..connections.search_index import index_file_analysis, index_product_summary
+from .scanner import compute_file_hash
+
+SNAPSHOT_VERSION = 1
+
+# Number of snapshot records merged per transaction on import
+IMPORT_BATCH_SIZE = 1000
+
+def write_record(f, record):
+    f.write(json.dumps(record, separators=(',', ':')))
+    f.write('\n')
+
+def export_project(directory, snapshot_path):
+    """Stream a project's products, files and latest analyses to a gzipped JSON lines file.
+
+    Paths are stored relative to the project root so the snapshot can be
+    imported on a machine where the project lives elsewhere.
+    """
+    initialize_database()
+    directory = os.path.abspath(os.path.expanduser(directory))
+
+    with DB_LOCK:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT id, name, summary, last_scanned FROM projects WHERE path = ?', (directory,))
+        project_row = cursor.fetchone()
+        if project_row is None:
+            print(f"No project found at '{directory}'. Please run analysis first.")
+            conn.close()
+            return
+        project_id, name, summary, last_scanned = project_row
+
+        count = 0
+        with gzip.open(snapshot_path, 'wt', encoding='utf-8') as f:
+            write_record(f, {
+                'type': 'snapshot',
+                'version': SNAPSHOT_VERSION,
+                'name': name,
+                'summary': summary,
+                'last_scanned': last_scanned
+            })
+
+            cursor.execute('SELECT manifest_path, name, type, summary FROM products WHERE project_id = ?', (project_id,))
+            for manifest_path, product_name, product_type, product_summary in cursor:
+                write_record(f, {
+                    'type': 'product',
+                    'manifest_path': manifest_path,
+                    'name': product_name,
+                    'product_type': product_type,
+                    'summary': product_summary
+                })
+
+            cursor.execute('''
+                SELECT f.relative_path, f.name, f.extension, f.type, f.last_modified, f.file_hash, f.skip_reason,
+                       p.manifest_path, fa.analysis_result, fa.analysis_timestamp
+                FROM files f
+                LEFT JOIN products p ON p.id = f.product_id
+                LEFT JOIN file_analysis fa ON fa.id = f.latest_analysis_id
+                WHERE f.project_id = ?
+            ''', (project_id,))
+            for row in cursor:
+                write_record(f, {
+                    'type': 'file',
+                    'relative_path': row[0],
+                    'name': row[1],
+                    'extension': row[2],
+                    'file_type': row[3],
+                    'last_modified': row[4],
+                    'file_hash': row[5],
+                    'skip_reason': row[6],
+                    'product': row[7],
+                    'analysis': row[8],
+                    'analysis_timestamp': row[9]
+                })
+                count += 1
+
+        conn.close()
+    return f"Exported {count} files from '{directory}' to '{snapshot_path}'."
+
+def import_project(snapshot_path, directory):
+    """Merge a snapshot into the local database, re-rooted at directory.
+
+    A local file that already has an analysis only takes the snapshot's data
+    when the snapshot matches the file on disk, so an older snapshot never
+    replaces the analysis of current content. Summaries are only filled in
+    where the local database has none.
+
+    Records are committed in batches. If the snapshot turns out to be damaged
+    part way through, the batches already committed are kept; they are merged
+    with the same rules, so re-running the import with a good file is safe.
+    """
+    initialize_database()
+    directory = os.path.abspath(os.path.expanduser(directory))
+
+    with DB_LOCK:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        committed = 0
+        imported = 0
+        try:
+            with gzip.open(snapshot_path, 'rt', encoding='utf-8') as f:
+                header = json.loads(f.readline() or 'null')
+                if not isinstance(header, dict) or header.get('type') != 'snapshot' \
+                        or header.get('version') != SNAPSHOT_VERSION:
+                    print(f"'{snapshot_path}' is not a supported snapshot file.")
+                    conn.close()
+                    return
+
+                cursor.execute('''
+                    INSERT OR IGNORE INTO projects (path, name, summary, last_scanned)
+                    VALUES (?, ?, ?, ?)
+                ''', (directory, header.get('name') or os.path.basename(directory), header.get('summary'),
+                      header.get('last_scanned')))
+                cursor.execute('SELECT id, summary FROM projects WHERE path = ?', (directory,))
+                project_id, project_summary = cursor.fetchone()
+                if not project_summary and header.get('summary'):
+                    cursor.execute('UPDATE projects SET summary = ? WHERE id = ?', (header['summary'], project_id))
+
+                product_ids = {}
+                for count, line in enumerate(f, start=1):
+                    record = json.loads(line)
+                    if record['type'] == 'product':
+                        product_ids[record['manifest_path']] = import_product(cursor, project_id, record)
+                    elif record['type'] == 'file':
+                        if import_file(cursor, project_id, product_ids.get(record['product']), record, directory):
+                            imported += 1
+                    if count % IMPORT_BATCH_SIZE == 0:
+                        conn.commit()
+                        committed = count
+        except (OSError, EOFError, ValueError, KeyError, TypeError) as e:
+            # ValueError covers malformed JSON and text that is not UTF-8
+            conn.rollback()
+            conn.close()
+            print(f"'{snapshot_path}' could not be read: {e}")
+            if committed:
+                print(f"The first {committed} records were imported; re-run the import with a complete snapshot.")
+            return
+
+        conn.commit()
+        conn.close()
+    return f"Imported {imported} file analyses from '{snapshot_path}' into '{directory}'."
+
+def import_product(cursor, project_id, record):
+    manifest_path = record['manifest_path']
+    cursor.execute('SELECT id, summary FROM products WHERE project_id = ? AND manifest_path = ?', (project_id, manifest_path))
+    row = cursor.fetchone()
+    if row is None:
+        cursor.execute('''
+            INSERT INTO products (project_id, name, type, summary, manifest_path)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (project_id, record['name'], record['product_type'], record['summary'], manifest_path))
+        product_id = cursor.lastrowid
+    else:
+        product_id, summary = row
+        if summary or not record['summary']:
+            return product_id
+        cursor.execute('UPDATE products SET summary = ? WHERE id = ?', (record['summary'], product_id))
+    if record['summary']:
+        index_product_summary(cursor, project_id, product_id, manifest_path, record['summary'])
+    return product_id
+
+def snapshot_matches_disk(directory, record):
+    file_path = os.path.join(directory, record['relative_path'])
+    return os.path.isfile(file_path) and compute_file_hash(file_path) == record['file_hash']
+
+def import_file(cursor, project_id, product_id, record, directory):
+    relative_path = record['relative_path']
+    cursor.execute('''
+        SELECT id, file_hash, latest_analysis_id FROM files
+        WHERE project_id = ? AND relative_path = ?
+    ''', (project_id, relative_path))
+    row = cursor.fetchone()
+    if row and row[2] is not None:
+        # Keep the local analysis unless the snapshot describes what is on disk now
+        if row[1] == record['file_hash'] or not snapshot_matches_disk(directory, record):
+            return False
+
+    if row is None:
+        cursor.execute('''
+            INSERT INTO files (
+                project_id, product_id, relative_path, name, extension, type, last_modified, file_hash, skip_reason
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            project_id, product_id, relative_path, record['name'], record['extension'], record['file_type'],
+            record['last_modified'], record['file_hash'], record['skip_reason']
+        ))
+        file_id = cursor.lastrowid
+    else:
+        file_id = row[0]
+        cursor.execute('''
+            UPDATE files SET product_id = ?, name = ?, extension = ?, type = ?, last_modified = ?,
+                file_hash = ?, skip_reason = ?, latest_analysis_id = NULL
+            WHERE id = ?
+        ''', (
+            product_id, record['name'], record['extension'], record['file_type'], record['last_modified'],
+            record['file_hash'], record['skip_reason'], file_id
+        ))
+
+    if not record['analysis']:
+        return False
+    cursor.execute('''
+        INSERT INTO file_analysis (file_id, analysis_result, analysis_timestamp)
+        VALUES (?, ?, ?)
+    ''', (file_id, record['analysis'], record['analysis_timestamp'] or time.time()))
+    cursor.execute('UPDATE files SET latest_analysis_id = ? WHERE id = ?', (cursor.lastrowid, file_id))
+    index_file_analysis(cursor, project_id, file_id, relative_path, record['analysis'])
+    return True
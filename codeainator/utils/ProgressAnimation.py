@@ -19,10 +19,14 @@ class ProgressAnimation:
         print('\r', end='')  # Clear the line when done
 
     def __enter__(self):
-        self.thread = threading.Thread(target=self.animate)
-        self.thread.start()
+        # Only animate on a terminal; redirected output would fill with dots
+        self.thread = None
+        if sys.stdout.isatty():
+            self.thread = threading.Thread(target=self.animate)
+            self.thread.start()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         self.done = True
-        self.thread.join()
\ No newline at end of file
+        if self.thread:
+            self.thread.join()
\ No newline at end of file
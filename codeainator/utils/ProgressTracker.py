@@ -0,0 +1,159 @@
+import json
+import sys
+import threading
+import time
+
+class ProgressTracker:
+    """Track scan throughput and report it as a refreshing line and/or JSON lines.
+
+    update() only bumps counters and compares timestamps; output is written at
+    most once per refresh interval so the per-file cost stays negligible.
+    """
+
+    TTY_INTERVAL = 0.5
+    LOG_INTERVAL = 30
+
+    def __init__(self, label, json_path=None, stream=None):
+        self.label = label
+        self.stream = stream or sys.stdout
+        self.total = 0
+        self.done = 0
+        self.errors = 0
+        self.skipped = 0
+        self.tokens = 0
+        self.started = time.monotonic()
+        self.last_render = 0
+        self.line_width = 0
+        self.lock = threading.Lock()
+
+        self.json_stream = None
+        if json_path == '-':
+            self.json_stream = sys.stdout
+        elif json_path:
+            self.json_stream = open(json_path, 'a')
+
+        # Never mix the human-readable line with JSON events on stdout
+        self.show_line = self.json_stream is not sys.stdout
+        self.tty = self.show_line and self.stream.isatty()
+        self.interval = self.TTY_INTERVAL if self.tty else self.LOG_INTERVAL
+
+    def add_total(self, count):
+        # Called once a project's walk finishes; a workspace emits one start
+        # per project with the running total
+        self.total += count
+        with self.lock:
+            self.emit('start', files=count, total=self.total)
+
+    def add_tokens(self, count):
+        self.tokens += count
+
+    def update(self, error=False, skipped=False):
+        self.done += 1
+        if error:
+            self.errors += 1
+        if skipped:
+            self.skipped += 1
+        now = time.monotonic()
+        if now - self.last_render >= self.interval:
+            self.last_render = now
+            self.render('progress')
+
+    def log(self, message):
+        with self.lock:
+            if self.tty:
+                self.clear_line()
+            if self.show_line:
+                print(message, file=self.stream)
+            self.emit('log', message=message)
+
+    def finish(self):
+        self.render('finish')
+        if self.tty:
+            print(file=self.stream)
+        if self.json_stream not in (None, sys.stdout):
+            self.json_stream.close()
+
+    def stats(self):
+        elapsed = time.monotonic() - self.started
+        files_per_second = self.done / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total - self.done, 0)
+        eta = remaining / files_per_second if files_per_second > 0 else None
+        return {
+            'done': self.done,
+            'total': self.total,
+            'queue': remaining,
+            'errors': self.errors,
+            'skipped': self.skipped,
+            'tokens': self.tokens,
+            'elapsed_s': round(elapsed, 1),
+            'files_per_s': round(files_per_second, 2),
+            'tokens_per_s': round(self.tokens / elapsed, 1) if elapsed > 0 else 0.0,
+            'eta_s': round(eta) if eta is not None else None
+        }
+
+    def render(self, event):
+        with self.lock:
+            self.write_stats(event)
+
+    def write_stats(self, event):
+        stats = self.stats()
+        self.emit(event, **stats)
+        if not self.show_line:
+            return
+        line = self.format_line(stats)
+        if self.tty:
+            padding = ' ' * max(self.line_width - len(line), 0)
+            self.stream.write(f'\r{line}{padding}')
+            self.stream.flush()
+            self.line_width = len(line)
+        else:
+            print(line, file=self.stream)
+
+    def format_line(self, stats):
+        percent = f" ({stats['done'] * 100 // stats['total']}%)" if stats['total'] else ''
+        eta = format_duration(stats['eta_s']) if stats['eta_s'] is not None else '--'
+        return (f"[{self.label}] {stats['done']}/{stats['total']} files{percent} | "
+                f"{stats['files_per_s']:.1f} files/s | {stats['tokens_per_s']:.0f} tokens/s | "
+                f"queue {stats['queue']} | errors {stats['errors']} | skipped {stats['skipped']} | ETA {eta}")
+
+    def clear_line(self):
+        self.stream.write('\r' + ' ' * self.line_width + '\r')
+        self.line_width = 0
+
+    def emit(self, event, **fields):
+        if self.json_stream is None:
+            return
+        record = {'event': event, 'label': self.label, 'ts': round(time.time(), 3)}
+        record.update(fields)
+        self.json_stream.write(json.dumps(record) + '\n')
+        self.json_stream.flush()
+
+class QueueProgress:
+    """Forward progress updates from a worker process to a ProgressTracker in the parent."""
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def add_total(self, count):
+        self.queue.put(('add_total', (count,)))
+
+    def add_tokens(self, count):
+        self.queue.put(('add_tokens', (count,)))
+
+    def update(self, error=False, skipped=False):
+        self.queue.put(('update', (error, skipped)))
+
+    def log(self, message):
+        self.queue.put(('log', (message,)))
+
+def drain_progress_queue(queue, tracker):
+    # Runs in a thread in the parent until a None sentinel is queued
+    for method, args in iter(queue.get, None):
+        getattr(tracker, method)(*args)
+
+def format_duration(seconds):
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f'{hours}h{minutes:02d}m'
+    return f'{minutes}m{seconds:02d}s'
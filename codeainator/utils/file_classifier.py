@@ -0,0 +1,59 @@
+# utils/file_classifier.py
+
+import os
+import re
+
+from ..config import (
+    MAX_ANALYSIS_FILE_SIZE, CLASSIFIER_SNIFF_BYTES, MINIFIED_MIN_SIZE, MINIFIED_AVG_LINE_LENGTH,
+    MINIFIED_MAX_LINE_LENGTH, MINIFIED_MAX_WHITESPACE_RATIO, GENERATED_FILE_MARKERS
+)
+
+# Only the first few lines are checked for generated-file markers
+GENERATED_HEADER_LINES = 10
+
+GENERATED_PATTERNS = [re.compile(marker) for marker in GENERATED_FILE_MARKERS]
+
+def is_minified(sample):
+    lines = sample.splitlines()
+    if len(sample) < MINIFIED_MIN_SIZE or not lines:
+        return False
+    longest = max(len(line) for line in lines)
+    average = len(sample) / len(lines)
+    if longest < MINIFIED_MAX_LINE_LENGTH or average < MINIFIED_AVG_LINE_LENGTH:
+        return False
+    whitespace = sum(sample.count(char) for char in (b' ', b'\t', b'\n', b'\r'))
+    return whitespace / len(sample) <= MINIFIED_MAX_WHITESPACE_RATIO
+
+def is_generated(sample):
+    for line in sample.splitlines()[:GENERATED_HEADER_LINES]:
+        text = line.decode('utf-8', errors='ignore')
+        if any(pattern.search(text) for pattern in GENERATED_PATTERNS):
+            return True
+    return False
+
+def classify_file(file_path):
+    """Return the reason a file should not be analyzed, or None if it should be.
+
+    Only the first block of the file is read, so this is cheap enough to run
+    on every file before its full contents are loaded.
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        sample = f.read(CLASSIFIER_SNIFF_BYTES)
+
+    if b'\x00' in sample:
+        return 'binary'
+    try:
+        sample.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A multi-byte character may be cut off at the end of a partial sample
+        truncated = len(sample) == CLASSIFIER_SNIFF_BYTES and e.start >= len(sample) - 3
+        if not truncated:
+            return 'binary'
+    if size > MAX_ANALYSIS_FILE_SIZE:
+        return 'oversized'
+    if is_generated(sample):
+        return 'generated'
+    if is_minified(sample):
+        return 'minified'
+    return None
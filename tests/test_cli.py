@@ -13,5 +13,37 @@ class TestCLI(unittest.TestCase):
             output = mock_stdout.getvalue()
             self.assertIn("usage: codeainator [-h]", output)
 
+    @patch('sys.argv', ['codeainator', '-s', 'database'])
+    @patch('codeainator.cli.search_analyses', return_value='1. [file] /project/db.py')
+    def test_search_prints_results(self, mock_search):
+        with patch('sys.stdout', new=io.StringIO()) as mock_stdout:
+            main()
+            mock_search.assert_called_once_with('database', None)
+            self.assertIn('/project/db.py', mock_stdout.getvalue())
+
+    @patch('sys.argv', ['codeainator', '-g', '-d', 'project', '-p', 'readme.tpl', 'README.md', '-p', 'arch.tpl', 'ARCH.md'])
+    @patch('codeainator.cli.generate_files', return_value=[])
+    def test_generate_multiple_pairs(self, mock_generate):
+        main()
+        mock_generate.assert_called_once_with('project', [['readme.tpl', 'README.md'], ['arch.tpl', 'ARCH.md']], use_cache=True)
+
+    @patch('sys.argv', ['codeainator', '-g', '-d', 'project', '-p', 'readme.tpl', 'README.md', '-o', 'out.md'])
+    @patch('codeainator.cli.generate_files')
+    def test_pair_rejects_output(self, mock_generate):
+        with patch('sys.stderr', new=io.StringIO()) as mock_stderr:
+            with self.assertRaises(SystemExit):
+                main()
+            self.assertIn("cannot be combined", mock_stderr.getvalue())
+        mock_generate.assert_not_called()
+
+    @patch('sys.argv', ['codeainator', '-a', '-d', 'p1', 'p2', '-j', '0'])
+    @patch('codeainator.cli.scan_projects')
+    def test_jobs_must_be_positive(self, mock_scan):
+        with patch('sys.stderr', new=io.StringIO()) as mock_stderr:
+            with self.assertRaises(SystemExit):
+                main()
+            self.assertIn("'-j/--jobs' must be at least 1", mock_stderr.getvalue())
+        mock_scan.assert_not_called()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
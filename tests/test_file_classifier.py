@@ -0,0 +1,81 @@
+import os
+import random
+import tempfile
+import unittest
+from codeainator.utils.file_classifier import classify_file
+from codeainator.config import MAX_ANALYSIS_FILE_SIZE, CLASSIFIER_SNIFF_BYTES
+
+class TestFileClassifier(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_source_file_is_analyzed(self):
+        path = self.write('main.py', b'def main():\n    print("hello")\n')
+        self.assertIsNone(classify_file(path))
+
+    def test_binary_file(self):
+        path = self.write('data.sqlite', b'SQLite format 3\x00' + b'\x00' * 100)
+        self.assertEqual(classify_file(path), 'binary')
+
+    def test_oversized_file(self):
+        path = self.write('fixture.json', b'{"a": 1}\n' * (MAX_ANALYSIS_FILE_SIZE // 9 + 1))
+        self.assertEqual(classify_file(path), 'oversized')
+
+    def test_generated_file(self):
+        path = self.write('api_pb2.py', b'# -*- coding: utf-8 -*-\n# Generated by the protocol buffer compiler.  DO NOT EDIT!\nimport sys\n')
+        self.assertEqual(classify_file(path), 'generated')
+
+    def test_minified_file(self):
+        rng = random.Random(0)
+        names = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(3)) for _ in range(400)]
+        body = ';'.join(f'var {n}=function(e,t){{return e+t}}' for n in names)
+        path = self.write('bundle.min.js', body.encode('utf-8'))
+        self.assertEqual(classify_file(path), 'minified')
+
+    def test_single_long_line_in_source_is_not_minified(self):
+        lines = [f'value_{i} = compute({i})\n' for i in range(200)]
+        lines.insert(10, 'PATTERN = re.compile(r"' + '(?:[a-z0-9]+|_)' * 120 + '")\n')
+        path = self.write('patterns.py', ''.join(lines).encode('utf-8'))
+        self.assertIsNone(classify_file(path))
+
+    def test_compact_json_config_is_not_minified(self):
+        body = '{' + ','.join(f'"option{i}":{i}' for i in range(120)) + '}'
+        path = self.write('settings.json', body.encode('utf-8'))
+        self.assertIsNone(classify_file(path))
+
+    def test_long_markdown_paragraphs_are_not_minified(self):
+        paragraph = ' '.join(['The scanner reuses analyses for files whose content has not changed.'] * 17)
+        path = self.write('README.md', ('# Project\n\n' + '\n\n'.join([paragraph] * 6) + '\n').encode('utf-8'))
+        self.assertIsNone(classify_file(path))
+
+    def test_invalid_utf8_at_end_of_short_file_is_binary(self):
+        path = self.write('notes.txt', b'plain text\n\xe2\x82')
+        self.assertEqual(classify_file(path), 'binary')
+
+    def test_multibyte_character_cut_off_by_sniff_is_text(self):
+        line = b'price = 10\n'
+        padding = b'#' * ((CLASSIFIER_SNIFF_BYTES - 1) % len(line))
+        data = line * ((CLASSIFIER_SNIFF_BYTES - 1) // len(line)) + padding + '\u20ac'.encode('utf-8') + b'\n'
+        path = self.write('long.txt', data)
+        self.assertIsNone(classify_file(path))
+
+    def test_prose_mentioning_do_not_edit_is_not_generated(self):
+        path = self.write('NOTES.md', b'# Notes\n\nPlease do not edit the generated section below by hand.\n')
+        self.assertIsNone(classify_file(path))
+
+    def test_go_generated_header(self):
+        path = self.write('types.go', b'// Code generated by stringer; DO NOT EDIT.\n\npackage types\n')
+        self.assertEqual(classify_file(path), 'generated')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import types
+import unittest
+from unittest.mock import patch
+from codeainator.controllers import generator
+
+def make_chunk(content):
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=content))])
+
+def failing_stream():
+    yield make_chunk('partial ')
+    raise ConnectionError('stream interrupted')
+
+class TestGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.output_path = os.path.join(self.tmpdir.name, 'README.md')
+
+    @patch.object(generator, 'store_cached_response')
+    @patch.object(generator, 'get_cached_response', return_value=None)
+    def test_stream_writes_output(self, mock_get, mock_store):
+        with patch.object(generator.client.chat.completions, 'create',
+                          return_value=iter([make_chunk('Hello '), make_chunk('world')])):
+            generator.stream_to_file('{}', 'template', self.output_path)
+        with open(self.output_path) as f:
+            self.assertEqual(f.read(), 'Hello world')
+        mock_store.assert_called_once()
+
+    @patch.object(generator, 'store_cached_response')
+    @patch.object(generator, 'get_cached_response', return_value=None)
+    def test_failed_stream_leaves_no_output(self, mock_get, mock_store):
+        with patch.object(generator.client.chat.completions, 'create', return_value=failing_stream()):
+            with self.assertRaises(ConnectionError):
+                generator.stream_to_file('{}', 'template', self.output_path)
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+        mock_store.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from codeainator.connections import database
+from codeainator.controllers import maintenance
+
+class TestMaintenance(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        db_path = os.path.join(self.tmpdir.name, 'codeainator.db')
+        for patcher in (
+            patch.object(database, 'DB_DIR', self.tmpdir.name),
+            patch.object(database, 'DB_PATH', db_path),
+            patch.object(maintenance, 'DB_PATH', db_path),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def add_file_with_analyses(self, cursor, file_id, count):
+        cursor.execute("INSERT INTO files (id, project_id, relative_path) VALUES (?, 1, ?)", (file_id, f'f{file_id}.py'))
+        for version in range(count):
+            cursor.execute('INSERT INTO file_analysis (file_id, analysis_result) VALUES (?, ?)',
+                           (file_id, f'{{"purpose": "v{version}"}}'))
+            cursor.execute('UPDATE files SET latest_analysis_id = ? WHERE id = ?', (cursor.lastrowid, file_id))
+
+    def test_compaction_keeps_newest_analyses(self):
+        database.initialize_database()
+        conn = database.get_db_connection()
+        cursor = conn.cursor()
+        self.add_file_with_analyses(cursor, 1, 5)
+        self.add_file_with_analyses(cursor, 2, 1)
+
+        removed = database.compact_analysis_history(cursor, 1, keep=2)
+        self.assertEqual(removed, 3)
+        cursor.execute('SELECT file_id, analysis_result FROM file_analysis ORDER BY id')
+        self.assertEqual(cursor.fetchall(), [
+            (1, '{"purpose": "v3"}'), (1, '{"purpose": "v4"}'), (2, '{"purpose": "v0"}')
+        ])
+        cursor.execute('SELECT fa.analysis_result FROM files f JOIN file_analysis fa ON fa.id = f.latest_analysis_id WHERE f.id = 1')
+        self.assertEqual(cursor.fetchone()[0], '{"purpose": "v4"}')
+        conn.close()
+
+    def test_latest_analysis_backfill(self):
+        # A database created before files had a latest_analysis_id column
+        conn = sqlite3.connect(database.DB_PATH)
+        conn.execute('''
+            CREATE TABLE files (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, project_id INTEGER, product_id INTEGER, relative_path TEXT,
+                name TEXT, extension TEXT, type TEXT, last_modified REAL, file_hash TEXT
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE file_analysis (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, file_id INTEGER, analysis_result TEXT, analysis_timestamp REAL
+            )
+        ''')
+        conn.execute("INSERT INTO files (id, project_id, relative_path) VALUES (1, 1, 'a.py'), (2, 1, 'b.py')")
+        conn.executemany('INSERT INTO file_analysis (file_id, analysis_result) VALUES (?, ?)',
+                         [(1, '{}'), (1, '{}'), (2, '{}')])
+        conn.commit()
+        conn.close()
+
+        database.initialize_database()
+        conn = sqlite3.connect(database.DB_PATH)
+        self.assertEqual(conn.execute('SELECT id, latest_analysis_id FROM files ORDER BY id').fetchall(), [(1, 2), (2, 3)])
+        conn.close()
+
+    def freelist_count(self):
+        conn = sqlite3.connect(database.DB_PATH)
+        count = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        conn.close()
+        return count
+
+    def test_vacuum_compacts_all_projects(self):
+        database.initialize_database()
+        conn = database.get_db_connection()
+        cursor = conn.cursor()
+        self.add_file_with_analyses(cursor, 1, database.ANALYSIS_HISTORY_KEEP + 2)
+        # Enough stale history to leave many free pages once it is deleted
+        cursor.execute("INSERT INTO files (id, project_id, relative_path) VALUES (2, 1, 'big.py')")
+        cursor.executemany('INSERT INTO file_analysis (file_id, analysis_result) VALUES (2, ?)',
+                           [('x' * 2000,)] * 500)
+        conn.commit()
+        cursor.execute('DELETE FROM file_analysis WHERE file_id = 2')
+        conn.commit()
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        conn.close()
+
+        free_before = self.freelist_count()
+        size_before = maintenance.database_size()
+        self.assertGreater(free_before, 100)
+
+        with patch('sys.stdout', new=open(os.devnull, 'w')):
+            output = maintenance.vacuum_database(100)
+        self.assertIn('Removed 2 old analyses.', output)
+        self.assertLessEqual(self.freelist_count(), free_before - 100)
+
+        with patch('sys.stdout', new=open(os.devnull, 'w')):
+            maintenance.vacuum_database()
+        self.assertEqual(self.freelist_count(), 0)
+        self.assertLess(maintenance.database_size(), size_before / 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from codeainator.utils.ProgressTracker import ProgressTracker
+
+class TestProgressTracker(unittest.TestCase):
+
+    def test_json_events(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            events_path = os.path.join(tmpdir, 'events.jsonl')
+            tracker = ProgressTracker('project', events_path, stream=io.StringIO())
+            tracker.add_total(3)
+            tracker.add_tokens(50)
+            tracker.update()
+            tracker.update(skipped=True)
+            tracker.update(error=True)
+            tracker.finish()
+            with open(events_path) as f:
+                events = [json.loads(line) for line in f]
+
+        start = next(event for event in events if event['event'] != 'log')
+        self.assertEqual((start['event'], start['total']), ('start', 3))
+
+        finish = events[-1]
+        self.assertEqual(finish['event'], 'finish')
+        self.assertEqual((finish['done'], finish['total'], finish['queue']), (3, 3, 0))
+        self.assertEqual((finish['errors'], finish['skipped'], finish['tokens']), (1, 1, 50))
+
+    def test_non_tty_output_is_throttled(self):
+        stream = io.StringIO()
+        tracker = ProgressTracker('project', stream=stream)
+        tracker.add_total(100)
+        for _ in range(100):
+            tracker.update()
+        # Only the first update renders within the log interval
+        self.assertEqual(stream.getvalue().count('[project]'), 1)
+        self.assertIn('ETA', stream.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
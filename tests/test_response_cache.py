@@ -0,0 +1,85 @@
+import os
+import tempfile
+import types
+import unittest
+from unittest.mock import patch
+from codeainator.connections import database, response_cache
+from codeainator.controllers import generator
+
+def make_chunk(content):
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=content))])
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.now = 1000000.0
+        for patcher in (
+            patch.object(database, 'DB_DIR', self.tmpdir.name),
+            patch.object(database, 'DB_PATH', os.path.join(self.tmpdir.name, 'codeainator.db')),
+            patch.object(response_cache, 'time', types.SimpleNamespace(time=lambda: self.now)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        database.initialize_database()
+
+    def test_hit_returns_stored_response(self):
+        response = '# Title\n\nUnicode ✓ and "quotes"\n'
+        response_cache.store_cached_response('key', response)
+        self.assertEqual(response_cache.get_cached_response('key'), response)
+        self.assertIsNone(response_cache.get_cached_response('other'))
+
+    def test_expired_entry_is_deleted(self):
+        response_cache.store_cached_response('key', 'old')
+        self.now += response_cache.RESPONSE_CACHE_TTL
+        self.assertIsNone(response_cache.get_cached_response('key'))
+
+        conn = database.get_db_connection()
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM response_cache').fetchone()[0], 0)
+        conn.close()
+
+    def test_least_recently_used_entries_are_evicted(self):
+        with patch.object(response_cache, 'RESPONSE_CACHE_MAX_ENTRIES', 2):
+            response_cache.store_cached_response('a', 'A')
+            self.now += 1
+            response_cache.store_cached_response('b', 'B')
+            self.now += 1
+            # Reading 'a' makes 'b' the least recently used entry
+            response_cache.get_cached_response('a')
+            self.now += 1
+            response_cache.store_cached_response('c', 'C')
+
+        self.assertEqual(response_cache.get_cached_response('a'), 'A')
+        self.assertIsNone(response_cache.get_cached_response('b'))
+        self.assertEqual(response_cache.get_cached_response('c'), 'C')
+
+    def test_key_depends_on_every_input(self):
+        key = generator.generation_cache_key('{}', 'template')
+        self.assertEqual(generator.generation_cache_key('{}', 'template'), key)
+        self.assertNotEqual(generator.generation_cache_key('{}', 'other template'), key)
+        self.assertNotEqual(generator.generation_cache_key('{"name": "app"}', 'template'), key)
+        with patch.dict(generator.PROMPTS, {'generate': 'another prompt'}):
+            self.assertNotEqual(generator.generation_cache_key('{}', 'template'), key)
+        with patch.object(generator, 'OPENAI_MODEL', 'another-model'):
+            self.assertNotEqual(generator.generation_cache_key('{}', 'template'), key)
+        # Adjacent parts cannot run together
+        self.assertNotEqual(response_cache.make_cache_key('ab', 'c'), response_cache.make_cache_key('a', 'bc'))
+
+    def test_no_cache_bypasses_cached_response(self):
+        output_path = os.path.join(self.tmpdir.name, 'README.md')
+        response_cache.store_cached_response(generator.generation_cache_key('{}', 'template'), 'cached')
+
+        with patch.object(generator.client.chat.completions, 'create') as mock_create:
+            generator.stream_to_file('{}', 'template', output_path)
+            mock_create.assert_not_called()
+        with open(output_path) as f:
+            self.assertEqual(f.read(), 'cached')
+
+        with patch.object(generator.client.chat.completions, 'create', return_value=iter([make_chunk('fresh')])):
+            generator.stream_to_file('{}', 'template', output_path, use_cache=False)
+        with open(output_path) as f:
+            self.assertEqual(f.read(), 'fresh')
+
+if __name__ == '__main__':
+    unittest.main()
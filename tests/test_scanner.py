@@ -0,0 +1,149 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from codeainator.config import PROMPTS
+from codeainator.connections import database
+from codeainator.controllers import scanner
+
+# Analysis calls are appended here so calls made in worker processes are counted too
+CALLS_LOG = None
+FAIL_ANALYSIS = False
+
+def fake_openai_chat(prompt, content, retries=2):
+    if prompt == PROMPTS['code_analysis']:
+        if FAIL_ANALYSIS:
+            raise RuntimeError('simulated API failure')
+        with open(CALLS_LOG, 'a') as f:
+            f.write(json.dumps(content) + '\n')
+    return json.dumps({'purpose': f'purpose of {content.strip()}'})
+
+class TestScanner(unittest.TestCase):
+
+    def setUp(self):
+        global CALLS_LOG
+        self.tmpdir = tempfile.TemporaryDirectory()
+        db_dir = os.path.join(self.tmpdir.name, 'db')
+        CALLS_LOG = os.path.join(self.tmpdir.name, 'calls.log')
+        open(CALLS_LOG, 'w').close()
+        for patcher in (
+            patch.object(database, 'DB_DIR', db_dir),
+            patch.object(database, 'DB_PATH', os.path.join(db_dir, 'codeainator.db')),
+            patch.object(scanner, 'call_openai_chat', fake_openai_chat),
+            patch('sys.stdout', new=open(os.devnull, 'w')),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def make_project(self, name, files):
+        root = os.path.join(self.tmpdir.name, name)
+        for relative_path, content in files.items():
+            self.write(root, relative_path, content)
+        return root
+
+    def write(self, root, relative_path, content):
+        path = os.path.join(root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def analysis_calls(self):
+        with open(CALLS_LOG) as f:
+            return [json.loads(line) for line in f]
+
+    def query(self, sql, params=()):
+        conn = sqlite3.connect(database.DB_PATH)
+        rows = conn.execute(sql, params).fetchall()
+        conn.close()
+        return rows
+
+    def latest_purpose(self, project, relative_path):
+        rows = self.query('''
+            SELECT fa.analysis_result FROM files f
+            JOIN projects p ON p.id = f.project_id
+            LEFT JOIN file_analysis fa ON fa.id = f.latest_analysis_id
+            WHERE p.path = ? AND f.relative_path = ?
+        ''', (project, relative_path))
+        return json.loads(rows[0][0])['purpose'] if rows and rows[0][0] else None
+
+    def test_scan_projects_only_analyzes_changed_files(self):
+        first = self.make_project('first', {'a.py': 'print("a")\n', 'b.py': 'print("b")\n'})
+        second = self.make_project('second', {'c.py': 'print("c")\n'})
+
+        self.assertEqual(scanner.scan_projects([first, second], jobs=2), [])
+        self.assertEqual(len(self.analysis_calls()), 3)
+        self.assertEqual(self.query('SELECT COUNT(*) FROM file_analysis')[0][0], 3)
+
+        self.write(first, 'a.py', 'print("a2")\n')
+        self.assertEqual(scanner.scan_projects([first, second], jobs=2), [])
+        self.assertEqual(self.analysis_calls()[3:], ['print("a2")\n'])
+        self.assertEqual(self.query('SELECT COUNT(*) FROM file_analysis')[0][0], 4)
+        self.assertEqual(self.latest_purpose(first, 'a.py'), 'purpose of print("a2")')
+
+    def test_scan_projects_stops_progress_thread_on_error(self):
+        project = self.make_project('project', {'a.py': 'print("a")\n'})
+        # A non-daemon thread left running would keep the process from exiting
+        def blocking_threads():
+            return [thread for thread in threading.enumerate() if not thread.daemon]
+
+        threads = blocking_threads()
+        with self.assertRaises(ValueError):
+            scanner.scan_projects([project], jobs=0)
+        self.assertEqual(blocking_threads(), threads)
+
+    def test_scan_project_finishes_progress_on_error(self):
+        project = self.make_project('project', {'a.py': 'print("a")\n'})
+        events_path = os.path.join(self.tmpdir.name, 'events.jsonl')
+        with patch.object(scanner, 'store_project', side_effect=RuntimeError('summary failed')):
+            with self.assertRaises(RuntimeError):
+                scanner.scan_project(project, events_path)
+        with open(events_path) as f:
+            events = [json.loads(line) for line in f]
+        self.assertEqual(events[-1]['event'], 'finish')
+
+    def test_failed_analysis_is_retried_on_rescan(self):
+        global FAIL_ANALYSIS
+        project = self.make_project('project', {'a.py': 'print(1)\n'})
+        scanner.scan_project(project)
+        self.assertEqual(self.latest_purpose(project, 'a.py'), 'purpose of print(1)')
+
+        self.write(project, 'a.py', 'print(2)\n')
+        FAIL_ANALYSIS = True
+        try:
+            scanner.scan_project(project)
+        finally:
+            FAIL_ANALYSIS = False
+        self.assertIsNone(self.latest_purpose(project, 'a.py'))
+
+        # The old analysis must not be handed to another project with the new content
+        other = self.make_project('other', {'a.py': 'print(2)\n'})
+        scanner.scan_project(other)
+        self.assertEqual(self.analysis_calls()[-1], 'print(2)\n')
+        self.assertEqual(self.latest_purpose(other, 'a.py'), 'purpose of print(2)')
+
+        # Rescanning the unchanged file retries it instead of keeping the old analysis
+        scanner.scan_project(project)
+        self.assertEqual(self.latest_purpose(project, 'a.py'), 'purpose of print(2)')
+
+    def test_file_becoming_skipped_drops_its_analysis(self):
+        project = self.make_project('project', {'a.py': 'print(1)\n'})
+        scanner.scan_project(project)
+        self.write(project, 'a.py', '# @generated\nprint(1)\n')
+        scanner.scan_project(project)
+        self.assertIsNone(self.latest_purpose(project, 'a.py'))
+
+    def test_deleted_files_are_pruned(self):
+        project = self.make_project('project', {'a.py': 'print("a")\n', 'b.py': 'print("b")\n'})
+        scanner.scan_project(project)
+        os.remove(os.path.join(project, 'b.py'))
+        scanner.scan_project(project)
+        self.assertEqual(self.query('SELECT relative_path FROM files'), [('a.py',)])
+        self.assertEqual(self.query('SELECT COUNT(*) FROM file_analysis')[0][0], 1)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM search_index WHERE path = 'b.py'")[0][0], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import json
+import sqlite3
+import unittest
+from codeainator.connections.search_index import (
+    create_search_index, index_file_analysis, index_product_summary, remove_project_from_index, file_rowid
+)
+
+class TestSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.cursor = self.conn.cursor()
+        self.cursor.execute('CREATE TABLE files (id INTEGER PRIMARY KEY, project_id INTEGER, relative_path TEXT, latest_analysis_id INTEGER)')
+        self.cursor.execute('CREATE TABLE file_analysis (id INTEGER PRIMARY KEY, file_id INTEGER, analysis_result TEXT)')
+        self.cursor.execute('CREATE TABLE products (id INTEGER PRIMARY KEY, project_id INTEGER, manifest_path TEXT, summary TEXT)')
+
+    def tearDown(self):
+        self.conn.close()
+
+    def match(self, term):
+        self.cursor.execute('SELECT rowid FROM search_index WHERE search_index MATCH ?', (term,))
+        return [row[0] for row in self.cursor.fetchall()]
+
+    def test_reindexing_replaces_the_file_row(self):
+        create_search_index(self.cursor)
+        index_file_analysis(self.cursor, 1, 7, 'a.py', json.dumps({'purpose': 'parses invoices'}))
+        index_file_analysis(self.cursor, 1, 7, 'a.py', json.dumps({'purpose': 'renders receipts'}))
+        self.assertEqual(self.match('invoices'), [])
+        self.assertEqual(self.match('receipts'), [file_rowid(7)])
+
+    def test_files_and_products_do_not_collide(self):
+        create_search_index(self.cursor)
+        index_file_analysis(self.cursor, 1, 3, 'a.py', json.dumps({'purpose': 'billing'}))
+        index_product_summary(self.cursor, 1, 3, 'package.json', 'billing service')
+        self.assertEqual(len(self.match('billing')), 2)
+
+    def test_old_layout_is_rebuilt(self):
+        self.cursor.execute('CREATE VIRTUAL TABLE search_index USING fts5(kind, path)')
+        self.cursor.execute("INSERT INTO search_index VALUES ('file', 'stale.py')")
+        self.cursor.execute("INSERT INTO files VALUES (1, 1, 'a.py', 1)")
+        self.cursor.execute("INSERT INTO file_analysis VALUES (1, 1, ?)", (json.dumps({'purpose': 'current'}),))
+        create_search_index(self.cursor)
+        self.assertEqual(self.match('stale'), [])
+        self.assertEqual(self.match('current'), [file_rowid(1)])
+
+    def test_remove_project(self):
+        create_search_index(self.cursor)
+        self.cursor.execute("INSERT INTO files VALUES (1, 1, 'a.py', NULL)")
+        index_file_analysis(self.cursor, 1, 1, 'a.py', json.dumps({'purpose': 'billing'}))
+        remove_project_from_index(self.cursor, 1)
+        self.assertEqual(self.match('billing'), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import gzip
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from codeainator.config import PROMPTS
+from codeainator.connections import database
+from codeainator.controllers import scanner, snapshot
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.calls = []
+        for patcher in (
+            patch.object(scanner, 'call_openai_chat', self.fake_openai_chat),
+            patch('sys.stdout', new=open(os.devnull, 'w')),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.use_database('first')
+        self.snapshot_path = os.path.join(self.tmpdir.name, 'project.jsonl.gz')
+
+    def fake_openai_chat(self, prompt, content, retries=2):
+        if prompt == PROMPTS['code_analysis']:
+            self.calls.append(content)
+        return json.dumps({'purpose': f'purpose of {content.strip()}'})
+
+    def use_database(self, name):
+        db_dir = os.path.join(self.tmpdir.name, name)
+        for patcher in (
+            patch.object(database, 'DB_DIR', db_dir),
+            patch.object(database, 'DB_PATH', os.path.join(db_dir, 'codeainator.db')),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def make_project(self, name, files):
+        root = os.path.join(self.tmpdir.name, name)
+        for relative_path, content in files.items():
+            self.write(root, relative_path, content)
+        return root
+
+    def write(self, root, relative_path, content):
+        path = os.path.join(root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def latest_purpose(self, project, relative_path):
+        conn = sqlite3.connect(database.DB_PATH)
+        row = conn.execute('''
+            SELECT fa.analysis_result FROM files f
+            JOIN projects p ON p.id = f.project_id
+            JOIN file_analysis fa ON fa.id = f.latest_analysis_id
+            WHERE p.path = ? AND f.relative_path = ?
+        ''', (project, relative_path)).fetchone()
+        conn.close()
+        return json.loads(row[0])['purpose'] if row else None
+
+    def test_round_trip_to_a_new_machine(self):
+        project = self.make_project('project', {
+            'package.json': '{"name": "app"}\n',
+            'src/app.py': 'print("app")\n',
+            'src/util.py': 'print("util")\n',
+        })
+        scanner.scan_project(project)
+        analyzed = len(self.calls)
+        snapshot.export_project(project, self.snapshot_path)
+
+        # A fresh database on another machine, with the project checked out elsewhere
+        self.use_database('second')
+        checkout = os.path.join(self.tmpdir.name, 'checkout')
+        shutil.copytree(project, checkout)
+        self.write(checkout, 'src/util.py', 'print("util changed")\n')
+
+        snapshot.import_project(self.snapshot_path, checkout)
+        self.assertEqual(self.latest_purpose(checkout, 'src/app.py'), 'purpose of print("app")')
+
+        scanner.scan_project(checkout)
+        self.assertEqual(self.calls[analyzed:], ['print("util changed")\n'])
+
+    def test_old_snapshot_does_not_replace_newer_analysis(self):
+        project = self.make_project('project', {'a.py': 'v1\n'})
+        scanner.scan_project(project)
+        snapshot.export_project(project, self.snapshot_path)
+
+        self.write(project, 'a.py', 'v2\n')
+        scanner.scan_project(project)
+        calls_before = len(self.calls)
+
+        snapshot.import_project(self.snapshot_path, project)
+        self.assertEqual(self.latest_purpose(project, 'a.py'), 'purpose of v2')
+        scanner.scan_project(project)
+        self.assertEqual(len(self.calls), calls_before)
+
+    def import_output(self, directory):
+        with patch('sys.stdout', new=io.StringIO()) as mock_stdout:
+            result = snapshot.import_project(self.snapshot_path, directory)
+        self.assertIsNone(result)
+        return mock_stdout.getvalue()
+
+    def test_damaged_snapshots_are_reported(self):
+        project = self.make_project('project', {'a.py': 'print("a")\n', 'b.py': 'print("b")\n'})
+        scanner.scan_project(project)
+        snapshot.export_project(project, self.snapshot_path)
+        with open(self.snapshot_path, 'rb') as f:
+            data = f.read()
+        with gzip.open(self.snapshot_path, 'rt') as f:
+            lines = f.readlines()
+
+        self.use_database('second')
+        checkout = os.path.join(self.tmpdir.name, 'checkout')
+        damaged = {
+            'not gzip': b'{"type": "snapshot"}\n',
+            'truncated': data[:len(data) // 2],
+            'bad json': gzip.compress(''.join(lines[:2] + ['{"type": "file", \n'] + lines[2:]).encode('utf-8')),
+            'missing field': gzip.compress(''.join(lines + ['{"type": "file"}\n']).encode('utf-8')),
+        }
+        for name, content in damaged.items():
+            with self.subTest(name):
+                with open(self.snapshot_path, 'wb') as f:
+                    f.write(content)
+                self.assertIn('could not be read', self.import_output(checkout))
+                self.assertIsNone(self.latest_purpose(checkout, 'a.py'))
+
+if __name__ == '__main__':
+    unittest.main()